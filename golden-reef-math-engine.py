@@ -11,17 +11,40 @@ Game Spec:
 - Target RTP: ~96.5%
 """
 
-import csv
 import json
 import itertools
-import random
+import multiprocessing
 import os
 import gzip
-import shutil
 from collections import defaultdict
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Tuple, Optional
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; the NumPy batch path is used instead
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+    prange = range
+
+try:
+    import orjson
+
+    def json_dumps(obj) -> str:
+        """Compact JSON text (orjson: C serializer, same output as json.dumps)."""
+        return orjson.dumps(obj).decode()
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    def json_dumps(obj) -> str:
+        """Compact JSON text."""
+        return json.dumps(obj, separators=(",", ":"))
+
 # ============================================================
 # SYMBOL DEFINITIONS
 # ============================================================
@@ -128,6 +151,59 @@ PAYLINES = [
 ]
 
 NUM_LINES = len(PAYLINES)
+NUM_REELS = len(REEL_STRIPS)
+NUM_ROWS = 3
+
+# ============================================================
+# INTEGER ENCODING (used by the vectorized evaluator)
+# ============================================================
+
+SYM_ID = {name: info["id"] for name, info in SYMBOLS.items()}
+SYM_NAMES = np.array(sorted(SYM_ID, key=SYM_ID.get))  # id -> name
+WILD_ID = SYM_ID["WILD"]
+SCATTER_ID = SYM_ID["SCATTER"]
+NUM_SYMBOLS = len(SYMBOLS)
+
+REEL_LENGTHS = np.array([len(strip) for strip in REEL_STRIPS])
+NUM_OUTCOMES = int(np.prod(REEL_LENGTHS))  # every combination of stops
+
+# Strips as a (reels, stops) int8 matrix; shorter reels are padded with -1,
+# which is never reached because stops wrap modulo each reel's own length.
+STRIPS = np.full((NUM_REELS, REEL_LENGTHS.max()), -1, dtype=np.int8)
+for _r, _strip in enumerate(REEL_STRIPS):
+    STRIPS[_r, :len(_strip)] = [SYM_ID[s] for s in _strip]
+
+# WINDOW_LUT[reel, stop] -> the 3 visible symbol ids, so the evaluators
+# gather a whole window with one index instead of three modulos.
+WINDOW_LUT = np.full((NUM_REELS, STRIPS.shape[1], NUM_ROWS), -1, dtype=np.int8)
+for _r, _length in enumerate(REEL_LENGTHS):
+    for _stop in range(_length):
+        WINDOW_LUT[_r, _stop] = STRIPS[_r, (_stop + np.arange(NUM_ROWS)) % _length]
+
+PAYLINES_ARR = np.array(PAYLINES, dtype=np.int8)  # (lines, reels) -> row
+
+# SWAR layout: symbol ids fit in 4 bits, so a spin's row-major grid packs into
+# one uint64 (15 nibbles) and each payline into 5 nibbles, reel 0 lowest.
+NIBBLE = np.uint64(4)
+GRID_SHIFTS = np.arange(NUM_REELS * NUM_ROWS, dtype=np.uint64) * NIBBLE
+LINE_SRC_SHIFTS = (PAYLINES_ARR.astype(np.uint64) * NUM_REELS
+                   + np.arange(NUM_REELS, dtype=np.uint64)) * NIBBLE  # (lines, reels)
+LINE_DST_SHIFTS = np.arange(NUM_REELS, dtype=np.uint64) * NIBBLE
+NIBBLE_LSBS = np.uint64(sum(1 << (4 * r) for r in range(NUM_REELS)))  # 0x11111
+NIBBLE_SUM_SHIFT = np.uint64(4 * (NUM_REELS - 1))  # top line nibble
+
+# PAYOUT_LUT[sym_id, count] -> line payout; zero for count < 3 and for SCATTER
+PAYOUT_LUT = np.zeros((NUM_SYMBOLS, NUM_REELS + 1), dtype=np.float64)
+for _name, _pays in PAYTABLE.items():
+    PAYOUT_LUT[SYM_ID[_name], 3:3 + len(_pays)] = _pays
+
+# Indexed by scatter count (0..15 visible positions)
+SCATTER_LUT = np.zeros(NUM_REELS * NUM_ROWS + 1, dtype=np.float64)
+FREESPIN_LUT = np.zeros(NUM_REELS * NUM_ROWS + 1, dtype=np.int32)
+for _count, _pay in SCATTER_PAY.items():
+    SCATTER_LUT[_count] = _pay
+for _count, _spins in FREE_SPINS_AWARDED.items():
+    FREESPIN_LUT[_count] = _spins
 
 # ============================================================
 # GAME LOGIC
@@ -148,78 +224,64 @@ def evaluate_payline(symbols_on_line: List[str]) -> Tuple[Optional[str], int, fl
     Evaluate a single payline left-to-right.
     Returns (winning_symbol, count, payout_multiplier) or (None, 0, 0.0).
     """
-    first = symbols_on_line[0]
-
-    # Determine the paying symbol (first non-wild, or wild if all wilds)
-    pay_symbol = None
-    for s in symbols_on_line:
-        if s == "SCATTER":
-            return (None, 0, 0.0)  # Scatters don't pay on lines
-        if s != "WILD":
-            pay_symbol = s
-            break
+    ids = [SYM_ID[s] for s in symbols_on_line]
 
-    if pay_symbol is None:
-        pay_symbol = "WILD"  # All wilds
+    # Paying symbol is the first non-wild (or wild if all wilds). A leading
+    # SCATTER needs no special case: its PAYOUT_LUT row is all zeros.
+    pay_id = next((i for i in ids if i != WILD_ID), WILD_ID)
 
     # Count consecutive matching symbols from left
     count = 0
-    for s in symbols_on_line:
-        if s == pay_symbol or s == "WILD":
-            count += 1
-        else:
+    for i in ids:
+        if i != pay_id and i != WILD_ID:
             break
+        count += 1
 
-    if count < 3:
+    payout = float(PAYOUT_LUT[pay_id, count])
+    if payout == 0.0:
         return (None, 0, 0.0)
-
-    if pay_symbol not in PAYTABLE:
-        return (None, 0, 0.0)
-
-    payout = PAYTABLE[pay_symbol][count - 3]
-    return (pay_symbol, count, payout)
+    return (str(SYM_NAMES[pay_id]), count, payout)
 
 
 def count_scatters(grid: List[List[str]]) -> int:
     """Count scatter symbols across the entire grid."""
-    count = 0
-    for reel in grid:
-        for sym in reel:
-            if sym == "SCATTER":
-                count += 1
-    return count
+    return sum(reel.count("SCATTER") for reel in grid)
+
+
+def count_scatters_batch(grid_ids: np.ndarray) -> np.ndarray:
+    """Scatter count per spin for (N, 15) symbol-id grids, in one comparison pass."""
+    return (grid_ids == SCATTER_ID).sum(axis=-1, dtype=np.int8)
 
 
-def evaluate_spin(stop_positions: List[int]) -> dict:
+def evaluate_spin(stop_positions: List[int]) -> Tuple[float, np.ndarray, np.ndarray, int, float, int]:
     """
     Evaluate a complete spin given stop positions for each reel.
-    Returns full result including grid, line wins, scatter wins, total payout.
+    Returns a flat tuple rather than nested dicts:
+    (total_payout, grid_ids, line_payouts, scatter_count, scatter_payout, free_spins)
+    where grid_ids is the row-major int8[15] grid and line_payouts is a
+    float64[20] vector, zero on losing lines.
     """
-    # Build the visible grid: grid[reel][row]
-    grid = []
-    for reel_idx, stop in enumerate(stop_positions):
-        grid.append(get_visible_window(REEL_STRIPS[reel_idx], stop))
-
-    # Evaluate each payline
-    line_wins = []
-    total_line_payout = 0.0
-
-    for line_idx, payline in enumerate(PAYLINES):
-        symbols_on_line = [grid[reel][payline[reel]] for reel in range(5)]
-        symbol, count, payout = evaluate_payline(symbols_on_line)
-        if payout > 0:
-            line_wins.append({
-                "line": line_idx + 1,
-                "symbol": symbol,
-                "count": count,
-                "payout": payout,
-            })
-            total_line_payout += payout
+    # Visible grid as symbol ids: windows[reel, row]
+    stops = np.asarray(stop_positions) % REEL_LENGTHS
+    windows = WINDOW_LUT[np.arange(NUM_REELS), stops]
+
+    # Gather all 20 paylines at once: line_syms[line, reel], shape (20, 5)
+    line_syms = windows[np.arange(NUM_REELS), PAYLINES_ARR]
+
+    # Paying symbol is the first non-wild (WILD if all wilds); wilds extend
+    # the run, and a leading SCATTER pays nothing via its zero PAYOUT_LUT row
+    is_wild = line_syms == WILD_ID
+    pay_sym = line_syms[np.arange(NUM_LINES), (~is_wild).argmax(axis=1)]
+    count = np.cumprod((line_syms == pay_sym[:, None]) | is_wild, axis=1).sum(axis=1)
+    line_payouts = PAYOUT_LUT[pay_sym, count]
+
+    # Summed in line order (like the batch and jit paths) so totals agree exactly
+    total_line_payout = float(np.cumsum(line_payouts)[-1])
 
     # Evaluate scatters
-    scatter_count = count_scatters(grid)
-    scatter_payout = SCATTER_PAY.get(scatter_count, 0.0)
-    free_spins = FREE_SPINS_AWARDED.get(scatter_count, 0)
+    scatter_count = int((windows == SCATTER_ID).sum())
+    scatter_payout = float(SCATTER_LUT[scatter_count])
+    free_spins = int(FREESPIN_LUT[scatter_count])
 
     # Total payout relative to TOTAL BET
     # Line wins are per-line-bet, so divide by NUM_LINES for total-bet multiplier
@@ -227,22 +289,191 @@ def evaluate_spin(stop_positions: List[int]) -> dict:
     total_payout = (total_line_payout / NUM_LINES) + scatter_payout
 
     # Flatten grid for output: row-major order
-    flat_grid = []
-    for row in range(3):
-        for reel in range(5):
-            flat_grid.append(grid[reel][row])
+    grid_ids = windows.T.ravel()
+
+    return total_payout, grid_ids, line_payouts, scatter_count, scatter_payout, free_spins
+
+
+def _nonzero_nibbles(words: np.ndarray) -> np.ndarray:
+    """Set the low bit of every non-zero nibble (of the 5 line nibbles)."""
+    words = words | (words >> np.uint64(1))
+    words = words | (words >> np.uint64(2))
+    return words & NIBBLE_LSBS
+
+
+def _first_set_nibble(masks: np.ndarray) -> np.ndarray:
+    """
+    Index of the lowest flagged nibble per mask (ctz / 4), NUM_REELS if none.
+    Counts the flags below the lowest one by multiplying by NIBBLE_LSBS, which
+    sums every nibble into the top one (no popcount, so any NumPy version).
+    """
+    lowest = masks & (~masks + np.uint64(1))
+    below = (lowest - np.uint64(1)) & NIBBLE_LSBS
+    return ((below * NIBBLE_LSBS) >> NIBBLE_SUM_SHIFT) & np.uint64(0xF)
+
+
+def evaluate_spins_batch(stops: np.ndarray) -> dict:
+    """
+    Vectorized evaluate_spin over an (N, 5) array of stop positions.
+    Same rules as the scalar path, returned as a dict of arrays: grid is
+    (N, 15) symbol ids in row-major order, line_* arrays are (N, 20).
+    """
+    stops = np.asarray(stops)
+    reel_idx = np.arange(NUM_REELS)
+
+    # windows[reel, spin, row] -> symbol id, shape (5, N, 3)
+    windows = WINDOW_LUT[reel_idx[:, None], stops.T]
+
+    grid = windows.transpose(1, 2, 0).reshape(len(stops), -1)
+
+    # Pack the grid into one word per spin, then gather each payline's five
+    # nibbles with shifts and masks: lines[spin, line] holds 5 symbol ids.
+    grid_words = np.bitwise_or.reduce(grid.astype(np.uint64) << GRID_SHIFTS, axis=1)
+    lines = np.zeros((len(stops), NUM_LINES), dtype=np.uint64)
+    for reel in range(NUM_REELS):
+        nibble = (grid_words[:, None] >> LINE_SRC_SHIFTS[:, reel]) & np.uint64(0xF)
+        lines |= nibble << LINE_DST_SHIFTS[reel]
+
+    # WILD is id 0, so non-zero nibbles are the non-wilds. The paying symbol is
+    # the first of them (WILD if all wilds); a leading SCATTER pays nothing
+    # because its PAYOUT_LUT row is zero.
+    non_wild = _nonzero_nibbles(lines)
+    first = _first_set_nibble(non_wild)
+    pay_shift = np.minimum(first, NUM_REELS - 1).astype(np.uint64) * NIBBLE
+    pay_sym = np.where(first < NUM_REELS, (lines >> pay_shift) & np.uint64(0xF), WILD_ID)
+    pay_sym = pay_sym.astype(np.int8)
+
+    # The run ends at the first nibble that is neither the paying symbol
+    # (XOR with it broadcast to all 5 nibbles is zero) nor a wild.
+    mismatch = _nonzero_nibbles(lines ^ (pay_sym.astype(np.uint64) * NIBBLE_LSBS)) & non_wild
+    count = _first_set_nibble(mismatch).astype(np.int64)
+
+    line_payouts = PAYOUT_LUT[pay_sym, count]
+
+    # Accumulate line by line so totals match the scalar path exactly
+    total_line_payout = np.zeros(len(stops), dtype=np.float64)
+    for line in range(NUM_LINES):
+        total_line_payout += line_payouts[:, line]
+
+    scatter_count = count_scatters_batch(grid)
+    scatter_payout = SCATTER_LUT[scatter_count]
 
     return {
-        "stops": stop_positions,
-        "grid": flat_grid,
-        "grid_2d": grid,
-        "line_wins": line_wins,
+        "stops": stops,
+        "grid": grid,
+        "line_symbols": pay_sym,
+        "line_counts": count,
+        "line_payouts": line_payouts,
         "scatter_count": scatter_count,
         "scatter_payout": scatter_payout,
-        "free_spins_awarded": free_spins,
+        "free_spins_awarded": FREESPIN_LUT[scatter_count],
         "total_line_payout": total_line_payout,
-        "total_payout": total_payout,
+        "total_payout": total_line_payout / NUM_LINES + scatter_payout,
+    }
+
+
+# No cache=True: this script is loaded under different module names (run
+# directly, or via importlib/runpy since its name has hyphens), and a cache
+# entry written under one cannot be loaded under another.
+@njit(parallel=True)
+def _spin_kernel(window_lut, paylines, payout_lut, scatter_lut, freespin_lut,
+                 stops, grid, line_symbols, line_counts, line_payouts,
+                 scatter_count, scatter_payout, free_spins,
+                 total_line_payout, total_payout):
+    """nopython kernel behind evaluate_spins_jit; fills the preallocated outputs."""
+    num_reels = stops.shape[1]
+    num_rows = grid.shape[1] // num_reels
+    num_lines = paylines.shape[0]
+
+    for i in prange(stops.shape[0]):
+        # Visible grid, row-major, counting scatters on the way
+        scatters = 0
+        for reel in range(num_reels):
+            for row in range(num_rows):
+                sym = window_lut[reel, stops[i, reel], row]
+                grid[i, row * num_reels + reel] = sym
+                if sym == SCATTER_ID:
+                    scatters += 1
+
+        line_total = 0.0
+        for line in range(num_lines):
+            pay = WILD_ID
+            for reel in range(num_reels):
+                sym = grid[i, paylines[line, reel] * num_reels + reel]
+                if sym != WILD_ID:
+                    pay = sym
+                    break
+
+            count = 0
+            for reel in range(num_reels):
+                sym = grid[i, paylines[line, reel] * num_reels + reel]
+                if sym != pay and sym != WILD_ID:
+                    break
+                count += 1
+
+            payout = payout_lut[pay, count]
+            line_symbols[i, line] = pay
+            line_counts[i, line] = count
+            line_payouts[i, line] = payout
+            line_total += payout
+
+        scatter_count[i] = scatters
+        scatter_payout[i] = scatter_lut[scatters]
+        free_spins[i] = freespin_lut[scatters]
+        total_line_payout[i] = line_total
+        total_payout[i] = line_total / num_lines + scatter_lut[scatters]
+
+
+def evaluate_spins_jit(stops: np.ndarray) -> dict:
+    """
+    Numba-compiled equivalent of evaluate_spins_batch (same keys and values).
+    Runs spins in parallel across cores; requires numba.
+    """
+    stops = np.ascontiguousarray(stops, dtype=np.int64)
+    n = len(stops)
+    out = {
+        "stops": stops,
+        "grid": np.empty((n, NUM_REELS * NUM_ROWS), dtype=np.int8),
+        "line_symbols": np.empty((n, NUM_LINES), dtype=np.int8),
+        "line_counts": np.empty((n, NUM_LINES), dtype=np.int64),
+        "line_payouts": np.empty((n, NUM_LINES), dtype=np.float64),
+        "scatter_count": np.empty(n, dtype=np.int8),
+        "scatter_payout": np.empty(n, dtype=np.float64),
+        "free_spins_awarded": np.empty(n, dtype=np.int32),
+        "total_line_payout": np.empty(n, dtype=np.float64),
+        "total_payout": np.empty(n, dtype=np.float64),
     }
+    _spin_kernel(
+        WINDOW_LUT, PAYLINES_ARR, PAYOUT_LUT, SCATTER_LUT, FREESPIN_LUT,
+        stops, out["grid"], out["line_symbols"], out["line_counts"], out["line_payouts"],
+        out["scatter_count"], out["scatter_payout"], out["free_spins_awarded"],
+        out["total_line_payout"], out["total_payout"],
+    )
+    return out
+
+
+def usable_cpu_count() -> int:
+    """Cores this process may run on (respects CPU affinity where the OS exposes it)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def evaluate_spins_parallel(stops: np.ndarray, workers: int) -> dict:
+    """
+    evaluate_spins_batch sharded across `workers` processes, for when numba
+    is unavailable (the jit kernel already spreads spins over cores via
+    prange). Opt-in only (run_simulation's workers): shipping every spin's
+    result arrays back to the parent is a large share of the evaluation
+    cost, and no speed-up over the serial path has been measured.
+    Stops are drawn by the caller, so results do not depend on the worker count.
+    """
+    stops = np.asarray(stops)
+    if workers < 2:
+        return evaluate_spins_batch(stops)
+    with multiprocessing.Pool(workers) as pool:
+        parts = pool.map(evaluate_spins_batch, np.array_split(stops, workers))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
 
 
 # ============================================================
@@ -250,113 +481,327 @@ def evaluate_spin(stop_positions: List[int]) -> dict:
 # ============================================================
 
 @dataclass
-class SimulationResult:
-    sim_id: int
-    stops: List[int]
-    grid: List[str]
-    total_payout: float
-    line_wins: List[dict]
-    scatter_count: int
-    scatter_payout: float
-    free_spins: int
+class SimulationBatch:
+    """Columnar (one array per field) results of a simulation run, indexed by sim_id."""
+    stops: np.ndarray           # int8[N, 5]
+    grid_ids: np.ndarray        # int8[N, 15], row-major symbol ids
+    total_payout: np.ndarray    # float64[N]
+    line_symbols: np.ndarray    # int8[N, 20], paying symbol id per line
+    line_counts: np.ndarray     # int8[N, 20]
+    line_payouts: np.ndarray    # float64[N, 20], zero where the line lost
+    scatter_count: np.ndarray   # int8[N]
+    scatter_payout: np.ndarray  # float64[N]
+    free_spins: np.ndarray      # int8[N]
     mode: str = "base"
 
+    def __len__(self) -> int:
+        return len(self.total_payout)
 
-def run_simulation(num_sims: int = 100_000, seed: int = 42) -> List[SimulationResult]:
-    """Run Monte Carlo simulation to generate game outcomes."""
-    rng = random.Random(seed)
-    results = []
-    reel_lengths = [len(strip) for strip in REEL_STRIPS]
 
-    for sim_id in range(num_sims):
-        stops = [rng.randint(0, reel_lengths[r] - 1) for r in range(5)]
-        result = evaluate_spin(stops)
+def run_simulation(num_sims: int = 100_000, seed: int = 42,
+                   workers: Optional[int] = None) -> SimulationBatch:
+    """
+    Run Monte Carlo simulation to generate game outcomes. Without numba,
+    passing workers shards the NumPy evaluation over that many processes
+    (evaluate_spins_parallel); by default it runs in this process.
+    """
+    rng = np.random.default_rng(seed)
+    # One PCG64 draw for every stop; `high` broadcasts per reel (column)
+    stops = rng.integers(0, REEL_LENGTHS, size=(num_sims, NUM_REELS))
+    if HAVE_NUMBA:
+        result = evaluate_spins_jit(stops)
+    elif workers:
+        result = evaluate_spins_parallel(stops, workers)
+    else:
+        result = evaluate_spins_batch(stops)
+
+    return SimulationBatch(
+        stops=stops.astype(np.int8),
+        grid_ids=result["grid"].astype(np.int8, copy=False),
+        total_payout=result["total_payout"],
+        line_symbols=result["line_symbols"].astype(np.int8, copy=False),
+        line_counts=result["line_counts"].astype(np.int8),
+        line_payouts=result["line_payouts"],
+        scatter_count=result["scatter_count"].astype(np.int8),
+        scatter_payout=result["scatter_payout"],
+        free_spins=result["free_spins_awarded"].astype(np.int8),
+    )
+
+
+def batch_line_wins(batch: SimulationBatch, spins: Optional[np.ndarray] = None) -> List[List[dict]]:
+    """
+    Line win dicts (same shape as evaluate_spin's line_wins) for each sim_id
+    in spins, in that order (default: every spin). Only the given spins'
+    lines are scanned, so callers that need a subset don't pay for the rest.
+    """
+    if spins is None:
+        spins = np.arange(len(batch))
+    line_wins = [[] for _ in range(len(spins))]
+    win_pos, win_line = np.nonzero(batch.line_payouts[spins] > 0)
+    win_spin = spins[win_pos]
+    symbols = SYM_NAMES[batch.line_symbols[win_spin, win_line]].tolist()
+    counts = batch.line_counts[win_spin, win_line].tolist()
+    payouts = batch.line_payouts[win_spin, win_line].tolist()
+    for i, line, symbol, count, payout in zip(
+            win_pos.tolist(), win_line.tolist(), symbols, counts, payouts):
+        line_wins[i].append({
+            "line": line + 1,
+            "symbol": symbol,
+            "count": count,
+            "payout": payout,
+        })
+    return line_wins
+
+
+def calculate_rtp(batch: SimulationBatch) -> float:
+    """Calculate Return to Player percentage."""
+    if len(batch) == 0:
+        return 0.0
+    return float(batch.total_payout.mean()) * 100  # 1 unit wagered per spin
 
-        results.append(SimulationResult(
-            sim_id=sim_id,
-            stops=stops,
-            grid=result["grid"],
-            total_payout=result["total_payout"],
-            line_wins=result["line_wins"],
-            scatter_count=result["scatter_count"],
-            scatter_payout=result["scatter_payout"],
-            free_spins=result["free_spins_awarded"],
-            mode="base",
-        ))
 
-    return results
+def _outcome_stops(start: int, stop: int) -> np.ndarray:
+    """Stops for outcomes [start, stop) of the lexicographic enumeration."""
+    return np.stack(np.unravel_index(np.arange(start, stop), REEL_LENGTHS), axis=-1)
 
 
-def calculate_rtp(results: List[SimulationResult]) -> float:
-    """Calculate Return to Player percentage."""
-    total_wagered = len(results)  # 1 unit per spin
-    total_won = sum(r.total_payout for r in results)
-    return (total_won / total_wagered) * 100 if total_wagered > 0 else 0.0
+def iter_all_stops(chunk_size: int = 262_144):
+    """
+    Yield every combination of reel stops (the full outcome space) as
+    (chunk_size, 5) arrays, in lexicographic order.
+    """
+    for start in range(0, NUM_OUTCOMES, chunk_size):
+        yield _outcome_stops(start, min(start + chunk_size, NUM_OUTCOMES))
+
 
+def _outcome_payout_sum(bounds: Tuple[int, int]) -> float:
+    """Total payout over one enumeration chunk (NumPy path, run in pool workers)."""
+    return float(evaluate_spins_batch(_outcome_stops(*bounds))["total_payout"].sum())
 
-def generate_probability_weights(results: List[SimulationResult]) -> List[Tuple[int, float, float]]:
+
+def enumerate_exact_rtp(chunk_size: int = 262_144, workers: Optional[int] = None) -> float:
+    """
+    Exact RTP percentage by evaluating every outcome once (32^5 ≈ 33.5M).
+    Each combination of stops is equally likely, so RTP is the plain mean.
+    Without numba the chunks are fanned out over `workers` processes. This
+    is the brute-force cross-check of calculate_exact_rtp, too slow for
+    every build without numba.
+    """
+    if HAVE_NUMBA:
+        total_won = sum(float(evaluate_spins_jit(stops)["total_payout"].sum())
+                        for stops in iter_all_stops(chunk_size))
+    else:
+        bounds = [(start, min(start + chunk_size, NUM_OUTCOMES))
+                  for start in range(0, NUM_OUTCOMES, chunk_size)]
+        workers = workers or usable_cpu_count()
+        if workers < 2:
+            total_won = sum(map(_outcome_payout_sum, bounds))
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                # imap keeps chunk order, so the float sum is deterministic
+                total_won = sum(pool.imap(_outcome_payout_sum, bounds))
+    return total_won / NUM_OUTCOMES * 100
+
+
+def calculate_exact_rtp() -> float:
+    """
+    Exact RTP percentage in closed form, without evaluating any spin.
+
+    Each payline reads one row per reel, and with a uniform stop that row
+    shows each symbol with its frequency on the strip, independently across
+    reels. So every payline has the same expected pay, computed from the
+    per-reel symbol probabilities. Scatters depend on the whole 3-row window,
+    so each reel's scatter-count distribution is tallied over its stops and
+    the five are convolved. Agrees with enumerate_exact_rtp.
+    """
+    freqs = np.stack([np.bincount(STRIPS[r, :length], minlength=NUM_SYMBOLS) / length
+                      for r, length in enumerate(REEL_LENGTHS)])  # (reels, symbols)
+    wild = freqs[:, WILD_ID]
+
+    # Expected pay of one line (per line bet). The paying symbol is the first
+    # non-wild, so a run of exactly k for symbol s means: the first k reels
+    # all show s-or-wild and not all wild, and reel k (if any) breaks the run.
+    # Wilds therefore only pay as five wilds; SCATTER's PAYOUT_LUT row is zero.
+    line_rtp = float(np.prod(wild)) * PAYOUT_LUT[WILD_ID, NUM_REELS]
+    for sym in range(NUM_SYMBOLS):
+        if sym == WILD_ID:
+            continue
+        hit = freqs[:, sym] + wild
+        for count in range(1, NUM_REELS + 1):
+            run = np.prod(hit[:count]) - np.prod(wild[:count])
+            breaks = 1.0 - hit[count] if count < NUM_REELS else 1.0
+            line_rtp += PAYOUT_LUT[sym, count] * run * breaks
+
+    # Scatter count distribution: per reel over its windows, then convolved
+    scatter_pmf = np.array([1.0])
+    for r, length in enumerate(REEL_LENGTHS):
+        reel_counts = (WINDOW_LUT[r, :length] == SCATTER_ID).sum(axis=1)
+        scatter_pmf = np.convolve(scatter_pmf, np.bincount(reel_counts, minlength=NUM_ROWS + 1) / length)
+    scatter_rtp = float(scatter_pmf @ SCATTER_LUT[:len(scatter_pmf)])
+
+    # Line pays are per line bet (total_bet / NUM_LINES) summed over every
+    # payline, so the total-bet contribution is the single-line expectation.
+    return float(line_rtp + scatter_rtp) * 100
+
+
+def generate_probability_weights(batch: SimulationBatch) -> List[Tuple[int, float, float]]:
     """
     Generate (sim_id, probability, payout) tuples.
     Each outcome is equally likely in base simulation.
     For Stake Engine: probability = 1/total_sims per unique outcome.
     """
-    total = len(results)
+    total = len(batch)
     prob = 1.0 / total
-    return [(r.sim_id, prob, r.total_payout) for r in results]
+    return [(sim_id, prob, payout) for sim_id, payout in enumerate(batch.total_payout.tolist())]
 
 
 # ============================================================
 # OUTPUT GENERATORS (Stake Engine Format)
 # ============================================================
 
-def export_csv(results: List[SimulationResult], filepath: str):
-    """Export results as Stake Engine compatible CSV."""
-    with open(filepath, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "simulation_number",
-            "probability",
-            "payout_multiplier",
-            "grid",
-            "stops",
-            "line_wins_count",
-            "scatter_count",
-            "free_spins",
-        ])
-
-        total = len(results)
-        prob = 1.0 / total
-
-        for r in results:
-            writer.writerow([
-                r.sim_id,
-                f"{prob:.10f}",
-                f"{r.total_payout:.2f}",
-                "|".join(r.grid),
-                "|".join(str(s) for s in r.stops),
-                len(r.line_wins),
-                r.scatter_count,
-                r.free_spins,
-            ])
-
-
-def export_game_events(results: List[SimulationResult], filepath: str):
-    """Export detailed game events as JSON (for /play API responses)."""
-    events = {}
-    for r in results:
-        events[str(r.sim_id)] = {
-            "stops": r.stops,
-            "grid": r.grid,
-            "totalPayout": r.total_payout,
-            "lineWins": r.line_wins,
-            "scatterCount": r.scatter_count,
-            "scatterPayout": r.scatter_payout,
-            "freeSpinsAwarded": r.free_spins,
-            "mode": r.mode,
-        }
+CSV_COLUMNS = [
+    "simulation_number",
+    "probability",
+    "payout_multiplier",
+    "grid",
+    "stops",
+    "line_wins_count",
+    "scatter_count",
+    "free_spins",
+]
+WRITE_BUFFER_SIZE = 1 << 20  # 1MB
+GZIP_LEVEL = 1  # much faster than gzip's default 9; files come out larger
+
 
-    with open(filepath, "w") as f:
-        json.dump(events, f, separators=(",", ":"))
+def open_gzip_output(filepath: str):
+    """Open a .gz file for streaming text output at GZIP_LEVEL."""
+    return gzip.open(filepath, "wt", compresslevel=GZIP_LEVEL, newline="")
+
+
+@contextmanager
+def open_outputs(outputs):
+    """
+    Yield a write(text) function that fans out to every output: paths are
+    opened (and closed) here, already-open text files are written as-is.
+    """
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(open(out, "w", newline="", buffering=WRITE_BUFFER_SIZE))
+            if isinstance(out, (str, os.PathLike)) else out
+            for out in outputs
+        ]
+
+        def write(text: str):
+            for f in files:
+                f.write(text)
+
+        yield write
+
+
+def export_csv(batch: SimulationBatch, *outputs):
+    """
+    Export results as Stake Engine compatible CSV.
+    The text is formatted once and written to every output (path or open file).
+    """
+    total = len(batch)
+    prob_str = f"{1.0 / total:.10f}"
+    line_wins_count = (batch.line_payouts > 0).sum(axis=1)
+
+    # Fixed schema, so rows are formatted directly (CRLF, as csv.writer emits)
+    # and written in one buffered call rather than through csv.writer. Every
+    # outcome has the same probability, so it is formatted once into the template.
+    row = ("{},%s,{:.2f},{},{},{},{},{}\r\n" % prob_str).format
+    rows = [
+        row(sim_id, payout, "|".join(grid), "|".join(map(str, stops)),
+            wins, scatters, spins)
+        for sim_id, (grid, stops, payout, wins, scatters, spins) in enumerate(zip(
+            SYM_NAMES[batch.grid_ids].tolist(),
+            batch.stops.tolist(),
+            batch.total_payout.tolist(),
+            line_wins_count.tolist(),
+            batch.scatter_count.tolist(),
+            batch.free_spins.tolist()))
+    ]
+
+    with open_outputs(outputs) as write:
+        write(",".join(CSV_COLUMNS) + "\r\n")
+        write("".join(rows))
+
+
+EVENTS_CHUNK_SIZE = 10_000  # records serialized per write
+
+
+# Fields shared by every losing spin of a mode (SimulationBatch.mode); only
+# stops, grid and scatterCount vary, and those follow from the stops (see
+# export_stops). export_game_events refuses to drop the losses of a mode
+# with no entry here.
+LOSS_EVENTS = {
+    "base": {
+        "totalPayout": 0.0,
+        "lineWins": [],
+        "scatterPayout": 0.0,
+        "freeSpinsAwarded": 0,
+        "mode": "base",
+    },
+}
+
+
+def export_game_events(batch: SimulationBatch, *outputs, include_losses: bool = False):
+    """
+    Export detailed game events as JSON (for /play API responses).
+    Only paying spins are written unless include_losses is set; losing spins
+    are LOSS_EVENTS[batch.mode] (in the game config) plus the grid rebuilt
+    from their stops, so leaving them out raises ValueError for a mode with
+    no LOSS_EVENTS entry. Line wins are built for the written spins only.
+    Records are serialized one at a time and streamed to every output (path
+    or open file) in chunks, so the full events dict is never built.
+    """
+    if include_losses:
+        keep = np.arange(len(batch))
+    elif batch.mode not in LOSS_EVENTS:
+        raise ValueError(f"no LOSS_EVENTS entry for mode {batch.mode!r}; "
+                         "add one or export with include_losses=True")
+    else:
+        keep = np.flatnonzero(batch.total_payout > 0)
+    records = zip(
+        keep.tolist(),
+        batch.stops[keep].tolist(),
+        SYM_NAMES[batch.grid_ids[keep]].tolist(),
+        batch.total_payout[keep].tolist(),
+        batch_line_wins(batch, keep),
+        batch.scatter_count[keep].tolist(),
+        batch.scatter_payout[keep].tolist(),
+        batch.free_spins[keep].tolist(),
+    )
+
+    with open_outputs(outputs) as write:
+        write("{")
+        chunk = []
+        sep = ""
+        for sim_id, stops, grid, payout, wins, scatters, scatter_pay, spins in records:
+            event = json_dumps({
+                "stops": stops,
+                "grid": grid,
+                "totalPayout": payout,
+                "lineWins": wins,
+                "scatterCount": scatters,
+                "scatterPayout": scatter_pay,
+                "freeSpinsAwarded": spins,
+                "mode": batch.mode,
+            })
+            chunk.append(f'"{sim_id}":{event}')
+            if len(chunk) == EVENTS_CHUNK_SIZE:
+                write(sep + ",".join(chunk))
+                chunk = []
+                sep = ","
+        if chunk:
+            write(sep + ",".join(chunk))
+        write("}")
+
+
+def export_stops(batch: SimulationBatch, filepath: str):
+    """Save every spin's stops as an int8[N, 5] .npy array (indexed by sim_id)."""
+    np.save(filepath, batch.stops)
 
 
 def export_game_config(filepath: str):
@@ -379,19 +824,13 @@ def export_game_config(filepath: str):
         "freeSpins": {str(k): v for k, v in FREE_SPINS_AWARDED.items()},
         "paylines": PAYLINES,
         "reelStrips": REEL_STRIPS,
+        "lossEvents": LOSS_EVENTS,
     }
 
     with open(filepath, "w") as f:
         json.dump(config, f, indent=2)
 
 
-def compress_output(input_path: str, output_path: str):
-    """Compress file with gzip for Stake Engine upload."""
-    with open(input_path, "rb") as f_in:
-        with gzip.open(output_path, "wb") as f_out:
-            shutil.copyfileobj(f_in, f_out)
-
-
 # ============================================================
 # MAIN EXECUTION
 # ============================================================
@@ -406,48 +845,53 @@ def main():
 
     # --- Run base game simulation ---
     print("\n[1/5] Running base game simulation (100,000 spins)...")
-    base_results = run_simulation(num_sims=100_000, seed=42)
+    base_batch = run_simulation(num_sims=100_000, seed=42)
 
-    rtp = calculate_rtp(base_results)
+    rtp = calculate_rtp(base_batch)
     print(f"       Base Game RTP: {rtp:.2f}%")
+    exact_rtp = calculate_exact_rtp()
+    print(f"       Exact RTP (closed form over all {NUM_OUTCOMES:,} outcomes): {exact_rtp:.4f}%")
 
     # --- Statistics ---
     print("\n[2/5] Calculating statistics...")
-    wins = [r for r in base_results if r.total_payout > 0]
-    scatter_triggers = [r for r in base_results if r.free_spins > 0]
-    max_win = max(r.total_payout for r in base_results)
-    avg_win = sum(r.total_payout for r in wins) / len(wins) if wins else 0
-
-    print(f"       Hit Rate: {len(wins)/len(base_results)*100:.1f}%")
-    print(f"       Scatter Triggers: {len(scatter_triggers)} ({len(scatter_triggers)/len(base_results)*100:.2f}%)")
+    payouts = base_batch.total_payout
+    num_spins = len(base_batch)
+    wins_mask = payouts > 0
+    win_count = int(wins_mask.sum())
+    scatter_triggers = int((base_batch.free_spins > 0).sum())
+    max_win = float(payouts.max())
+    avg_win = float(payouts[wins_mask].mean()) if win_count else 0
+
+    print(f"       Hit Rate: {win_count/num_spins*100:.1f}%")
+    print(f"       Scatter Triggers: {scatter_triggers} ({scatter_triggers/num_spins*100:.2f}%)")
     print(f"       Max Win: {max_win:.1f}x")
     print(f"       Avg Win (when winning): {avg_win:.2f}x")
 
-    # --- Payout distribution ---
+    # --- Payout distribution (one histogram pass over the payout column) ---
     print("\n       Payout Distribution:")
-    brackets = [(0, 0), (0.01, 2), (2, 5), (5, 10), (10, 50), (50, 100), (100, float("inf"))]
-    for lo, hi in brackets:
-        count = sum(1 for r in base_results if lo <= r.total_payout < hi)
-        if lo == 0 and hi == 0:
-            count = sum(1 for r in base_results if r.total_payout == 0)
-            label = "  0x (loss)"
-        elif hi == float("inf"):
-            label = f"  {lo}x+"
-        else:
-            label = f"  {lo}-{hi}x"
-        print(f"       {label}: {count:>6} ({count/len(base_results)*100:.1f}%)")
+    # The smallest possible win is well above 0.01x, so [0, 0.01) is the loss bucket
+    edges = [0, 0.01, 2, 5, 10, 50, 100, np.inf]
+    labels = ["  0x (loss)", "  0.01-2x", "  2-5x", "  5-10x", "  10-50x", "  50-100x", "  100x+"]
+    counts, _ = np.histogram(payouts, bins=edges)
+    for label, count in zip(labels, counts.tolist()):
+        print(f"       {label}: {count:>6} ({count/num_spins*100:.1f}%)")
 
     # --- Export CSV ---
     print("\n[3/5] Exporting base game CSV...")
     csv_path = os.path.join(output_dir, "base_game.csv")
-    export_csv(base_results, csv_path)
-    print(f"       Saved: {csv_path}")
+    with open_gzip_output(csv_path + ".gz") as gz:
+        export_csv(base_batch, csv_path, gz)
+    print(f"       Saved: {csv_path} (+ .gz)")
 
     # --- Export game events JSON ---
     print("\n[4/5] Exporting game events JSON...")
     events_path = os.path.join(output_dir, "base_game_events.json")
-    export_game_events(base_results, events_path)
-    print(f"       Saved: {events_path}")
+    with open_gzip_output(events_path + ".gz") as gz:
+        export_game_events(base_batch, events_path, gz)
+    print(f"       Saved: {events_path} (+ .gz)")
+    stops_path = os.path.join(output_dir, "base_game_stops.npy")
+    export_stops(base_batch, stops_path)
+    print(f"       Saved: {stops_path}")
 
     # --- Export config ---
     print("\n[5/5] Exporting game configuration...")
@@ -455,11 +899,10 @@ def main():
     export_game_config(config_path)
     print(f"       Saved: {config_path}")
 
-    # --- Compress for upload ---
-    print("\n[+] Compressing files for Stake Engine upload...")
+    # --- Compressed upload files (written alongside the exports above) ---
+    print("\n[+] Compressed files for Stake Engine upload:")
     for fpath in [csv_path, events_path]:
         gz_path = fpath + ".gz"
-        compress_output(fpath, gz_path)
         orig_size = os.path.getsize(fpath)
         gz_size = os.path.getsize(gz_path)
         print(f"       {os.path.basename(fpath)}: {orig_size//1024}KB → {gz_size//1024}KB")
@@ -3,64 +3,111 @@ RTP Tuner
 =========
 Adjusts reel strip composition to achieve target RTP.
 Strategy: Increase high-value symbol frequency and add more wilds.
+Each candidate is scored with the closed-form exact_rtp; quick_sim remains
+as a Monte Carlo cross-check.
 """
 
 import random
 import sys
 from collections import Counter
+
+import numpy as np
+
 from slot_config import (
-    SYMBOLS, REEL_STRIPS, NUM_REELS, NUM_ROWS, PAYLINES, PAYTABLE,
-    SCATTER_PAYS, TARGET_RTP
+    SYMBOLS, REEL_STRIPS, NUM_REELS, NUM_ROWS, PAYLINES, NUM_PAYLINES, PAYTABLE,
+    SCATTER_PAYS, TARGET_RTP,
+    SYMBOL_ID, WILD_ID, SCATTER_ID, PAYTABLE_ARR, SCATTER_PAYS_ARR
 )
 
 random.seed(42)
+rng = np.random.default_rng(42)
 
-def quick_sim(strips, num_spins=500_000):
-    """Fast RTP estimation."""
-    total_payout = 0
-    num_paylines = len(PAYLINES)
-
-    for _ in range(num_spins):
-        # Random stops
-        grid = []
-        for r in range(NUM_REELS):
-            stop = random.randint(0, len(strips[r]) - 1)
-            col = [
-                strips[r][stop % len(strips[r])],
-                strips[r][(stop + 1) % len(strips[r])],
-                strips[r][(stop + 2) % len(strips[r])],
-            ]
-            grid.append(col)
-
-        # Evaluate paylines
-        line_total = 0
-        for payline in PAYLINES:
-            syms = [grid[reel][row] for reel, row in enumerate(payline)]
-            pay_sym = None
-            for s in syms:
-                if s == 'S': pay_sym = None; break
-                if s != 'W': pay_sym = s; break
-            if pay_sym is None and all(s == 'W' or s == 'S' for s in syms):
-                if 'S' not in syms: pay_sym = 'W'
-            if pay_sym is None: continue
-
-            count = 0
-            for s in syms:
-                if s == pay_sym or s == 'W': count += 1
-                else: break
-
-            if count >= 3 and pay_sym in PAYTABLE and count in PAYTABLE[pay_sym]:
-                line_total += PAYTABLE[pay_sym][count]
-
-        total_payout += line_total / num_paylines
-
-        # Scatters
-        sc = sum(1 for col in grid for sym in col if sym == 'S')
-        total_payout += SCATTER_PAYS.get(sc, 0)
 
+def quick_sim(strips, num_spins=500_000):
+    """
+    Fast RTP estimation (Monte Carlo). Strips are converted to int ids once
+    and all spins are evaluated as whole-array integer comparisons.
+    """
+    # Draw every stop up front in one call; `high` broadcasts per reel
+    reel_lengths = [len(strip) for strip in strips]
+    stops = rng.integers(0, reel_lengths, size=(num_spins, NUM_REELS))
+
+    # windows[reel] -> (num_spins, 3) visible symbol ids
+    windows = []
+    for r, strip in enumerate(strips):
+        ids = np.array([SYMBOL_ID[s] for s in strip], dtype=np.int8)
+        windows.append(ids[(stops[:, r, None] + np.arange(NUM_ROWS)) % len(strip)])
+
+    # Evaluate paylines: pay symbol is the first non-wild (W if all wilds),
+    # and a leading scatter pays nothing via its zero PAYTABLE_ARR row
+    line_total = np.zeros(num_spins)
+    spin_idx = np.arange(num_spins)
+    for payline in PAYLINES:
+        syms = np.stack([windows[reel][:, row] for reel, row in enumerate(payline)], axis=1)
+        is_wild = syms == WILD_ID
+        pay_sym = syms[spin_idx, (~is_wild).argmax(axis=1)]
+        count = np.cumprod((syms == pay_sym[:, None]) | is_wild, axis=1).sum(axis=1)
+        line_total += PAYTABLE_ARR[pay_sym, count]
+
+    # Scatters
+    sc = sum((window == SCATTER_ID).sum(axis=1) for window in windows)
+
+    total_payout = line_total.sum() / NUM_PAYLINES + SCATTER_PAYS_ARR[sc].sum()
     return total_payout / num_spins
 
 
+def exact_rtp(strips):
+    """
+    Exact RTP of the strips in closed form (no sampling).
+
+    Each payline reads one row per reel, and with a uniform stop that row
+    shows each symbol with its frequency on the strip, independently across
+    reels. So every payline has the same expected pay, computed from the
+    per-reel symbol probabilities. Scatters depend on the whole 3-row window,
+    so each reel's scatter-count distribution is tallied over its stops and
+    the five are convolved.
+    """
+    freqs = []
+    for strip in strips:
+        counts = Counter(strip)
+        freqs.append({sym: counts[sym] / len(strip) for sym in SYMBOLS})
+
+    # Expected pay of one line (per line bet). The paying symbol is the first
+    # non-wild, so a run of exactly k for symbol s means: the first k reels
+    # all show s-or-wild and not all wild, and reel k (if any) breaks the run.
+    # Wilds therefore only pay as five wilds.
+    line_rtp = 0.0
+    for sym, pays in PAYTABLE.items():
+        if sym == 'W':
+            continue
+        for count, pay in pays.items():
+            run = np.prod([freqs[r][sym] + freqs[r]['W'] for r in range(count)])
+            all_wild = np.prod([freqs[r]['W'] for r in range(count)])
+            breaks = 1.0
+            if count < NUM_REELS:
+                breaks = 1.0 - freqs[count][sym] - freqs[count]['W']
+            line_rtp += pay * (run - all_wild) * breaks
+    if 5 in PAYTABLE.get('W', {}):
+        line_rtp += PAYTABLE['W'][5] * np.prod([f['W'] for f in freqs])
+
+    # Line pays are per line bet (total_bet / num_paylines) summed over every
+    # payline, so the total-bet contribution is the single-line expectation.
+    rtp = line_rtp
+
+    # Scatter count distribution: per reel over its windows, then convolved
+    scatter_pmf = np.array([1.0])
+    for strip in strips:
+        reel_pmf = np.zeros(NUM_ROWS + 1)
+        for stop in range(len(strip)):
+            window = [strip[(stop + row) % len(strip)] for row in range(NUM_ROWS)]
+            reel_pmf[window.count('S')] += 1
+        scatter_pmf = np.convolve(scatter_pmf, reel_pmf / len(strip))
+    rtp += sum(scatter_pmf[count] * pay for count, pay in SCATTER_PAYS.items()
+               if count < len(scatter_pmf))
+
+    return float(rtp)
+
+
 def tune_strips(target_rtp=TARGET_RTP, iterations=50):
     """Iteratively adjust reel strips to approach target RTP."""
     print(f"Target RTP: {target_rtp*100:.2f}%\n")
@@ -68,7 +115,7 @@ def tune_strips(target_rtp=TARGET_RTP, iterations=50):
     # Start with current strips (mutable copy)
     strips = [list(s) for s in REEL_STRIPS]
 
-    current_rtp = quick_sim(strips)
+    current_rtp = exact_rtp(strips)
     print(f"Starting RTP: {current_rtp*100:.2f}%")
 
     all_symbols = ['W', 'H1', 'H2', 'H3', 'L1', 'L2', 'L3', 'L4', 'S']
@@ -113,7 +160,7 @@ def tune_strips(target_rtp=TARGET_RTP, iterations=50):
                         pos = random.choice(high_positions)
                         strip[pos] = random.choice(low_value)
 
-        current_rtp = quick_sim(strips)
+        current_rtp = exact_rtp(strips)
 
         if abs(current_rtp - target_rtp) < abs(best_rtp - target_rtp):
             best_rtp = current_rtp
@@ -5,30 +5,94 @@ Generates all possible game outcomes for Stake Engine.
 Each outcome includes: simulation_number, probability, payout_multiplier
 
 For a 5-reel, 30-stop slot, total combinations = 30^5 = 24,300,000.
-We use Monte Carlo sampling to generate a representative set of outcomes,
-then bucket them by payout to create the compressed outcome files.
+That is small enough to enumerate every outcome in batches, so the base
+game's payout probabilities are exact; those outcomes are bucketed by
+payout to create the compressed outcome files. Free spins sessions (and
+run_simulation) still use Monte Carlo sampling.
 """
 
-import csv
 import gzip
 import json
 import os
-import random
 import time
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from itertools import product as cartesian_product
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; the NumPy batch path is used instead
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):  # bare @njit / njit(func)
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+try:
+    from numba import cuda, int32, uint64
+    from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_next
+    HAVE_CUDA = cuda.is_available()
+except ImportError:  # numba.cuda is optional and needs a CUDA driver at runtime
+    HAVE_CUDA = False
+
+try:
+    import orjson
+
+    def json_dumps(obj):
+        """Indented JSON text (orjson: C serializer, same output as json.dumps(indent=2))."""
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    def json_dumps(obj):
+        """Indented JSON text."""
+        return json.dumps(obj, indent=2)
+
 from slot_config import (
-    SYMBOLS, REEL_STRIPS, NUM_REELS, NUM_ROWS, STOPS_PER_REEL,
-    PAYLINES, PAYTABLE, SCATTER_PAYS, FREE_SPINS_TRIGGER,
-    FREE_SPINS_MULTIPLIER, TARGET_RTP
+    SYMBOLS, NUM_REELS, NUM_ROWS, STOPS_PER_REEL, NUM_OUTCOMES,
+    PAYLINES, NUM_PAYLINES, PAYTABLE, SCATTER_PAYS, FREE_SPINS_TRIGGER,
+    FREE_SPINS_MULTIPLIER, TARGET_RTP,
+    SYMBOL_NAMES, WILD_ID, SCATTER_ID, REEL_STRIPS_NP,
+    PAYLINE_IDX, PAYTABLE_ARR, SCATTER_PAYS_ARR, FREE_SPINS_ARR
 )
 
-random.seed(42)  # Reproducible results
+rng = np.random.default_rng(42)  # Reproducible results (PCG64)
+
+# Spins evaluated per NumPy batch (bounds the temporaries' memory)
+SIM_CHUNK_SIZE = 500_000
+EXHAUSTIVE_BATCH_SIZE = 1 << 20
+# simulate_payout_histogram splits every run into this many shards, each with
+# its own child seed, so results depend on the seed alone (not the core count)
+HISTOGRAM_SHARDS = 64
+# Outcome index -> stops: OUTCOME_STRIDES[reel] = STOPS_PER_REEL ** (NUM_REELS - 1 - reel)
+OUTCOME_STRIDES = STOPS_PER_REEL ** np.arange(NUM_REELS - 1, -1, -1, dtype=np.int64)
+# Largest possible spin payout in cents (every line at the top pay, plus
+# the top scatter pay), bounding the payout histograms
+MAX_PAYOUT_CENTS = 100 * (int(PAYTABLE_ARR.max()) + int(SCATTER_PAYS_ARR.max()))
+# Payouts are integer cents of total bet, and a unit of line pay is worth
+# 100 / NUM_PAYLINES of them: refuse line counts that would truncate
+if 100 % NUM_PAYLINES:
+    raise ValueError(f"NUM_PAYLINES ({NUM_PAYLINES}) must divide 100 for exact payout cents")
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Plain-int copies of the slot_config arrays for the per-spin path, where
+# indexing a list beats indexing a NumPy array one element at a time.
+STRIP_IDS = REEL_STRIPS_NP.tolist()
+PAY_IDS = PAYTABLE_ARR.tolist()
+SCATTER_PAY_IDS = SCATTER_PAYS_ARR.tolist()
+FREE_SPIN_IDS = FREE_SPINS_ARR.tolist()
+
+# Reels with their first NUM_ROWS - 1 stops repeated at the end, so the
+# window at any stop is a plain slice with no wrap-around
+WRAPPED_STRIPS = np.concatenate([REEL_STRIPS_NP, REEL_STRIPS_NP[:, :NUM_ROWS - 1]], axis=1)
+
 
 # ─── CORE EVALUATION FUNCTIONS ──────────────────────────────────────
 
@@ -36,11 +100,11 @@ def get_visible_grid(stop_positions):
     """
     Given a list of stop positions (one per reel), return the 5x3 visible grid.
     Each reel wraps around, so we take stop, stop+1, stop+2 (mod reel length).
-    Returns: list of 5 columns, each column is 3 symbols (top to bottom).
+    Returns: list of 5 columns, each column is 3 symbol ids (top to bottom).
     """
     grid = []
     for reel_idx, stop in enumerate(stop_positions):
-        strip = REEL_STRIPS[reel_idx]
+        strip = STRIP_IDS[reel_idx]
         reel_len = len(strip)
         column = [
             strip[stop % reel_len],
@@ -51,6 +115,11 @@ def get_visible_grid(stop_positions):
     return grid
 
 
+def grid_symbols(grid):
+    """Map a grid of symbol ids back to symbol keys for exported examples."""
+    return [[SYMBOL_NAMES[sym] for sym in column] for column in grid]
+
+
 def evaluate_payline(grid, payline):
     """
     Evaluate a single payline on the grid.
@@ -60,30 +129,28 @@ def evaluate_payline(grid, payline):
     # Get the symbols on this payline
     symbols_on_line = [grid[reel][row] for reel, row in enumerate(payline)]
 
-    # Determine the paying symbol (first non-wild from left)
-    pay_symbol = None
+    # Determine the paying symbol (first non-wild from left);
+    # if all wilds, pay as wild
+    pay_symbol = WILD_ID
     for sym in symbols_on_line:
-        if sym == "S":
+        if sym == SCATTER_ID:
             return None  # Scatter doesn't pay on paylines
-        if sym != "W":
+        if sym != WILD_ID:
             pay_symbol = sym
             break
 
-    # If all wilds, pay as wild
-    if pay_symbol is None:
-        pay_symbol = "W"
-
     # Count consecutive matches from left (wilds count)
     count = 0
     for sym in symbols_on_line:
-        if sym == pay_symbol or sym == "W":
+        if sym == pay_symbol or sym == WILD_ID:
             count += 1
         else:
             break
 
-    # Check if we have a winning combination
-    if count >= 3 and pay_symbol in PAYTABLE and count in PAYTABLE[pay_symbol]:
-        return (pay_symbol, count, PAYTABLE[pay_symbol][count])
+    # Check if we have a winning combination (PAY_IDS is zero below 3)
+    payout = PAY_IDS[pay_symbol][count]
+    if payout:
+        return (SYMBOL_NAMES[pay_symbol], count, payout)
 
     return None
 
@@ -93,23 +160,22 @@ def evaluate_scatters(grid):
     Count scatter symbols anywhere on the grid.
     Returns (scatter_count, scatter_payout, free_spins_awarded).
     """
-    scatter_count = 0
-    for reel in grid:
-        for sym in reel:
-            if sym == "S":
-                scatter_count += 1
+    scatter_count = sum(reel.count(SCATTER_ID) for reel in grid)
 
-    scatter_payout = SCATTER_PAYS.get(scatter_count, 0)
-    free_spins = FREE_SPINS_TRIGGER.get(scatter_count, 0)
+    scatter_payout = SCATTER_PAY_IDS[scatter_count]
+    free_spins = FREE_SPIN_IDS[scatter_count]
 
     return scatter_count, scatter_payout, free_spins
 
 
 def evaluate_spin(stop_positions):
     """
-    Evaluate a complete spin. Returns:
+    Evaluate a complete spin. Returns a flat tuple
+    (total_payout, grid, winning_lines, scatter_count, free_spins):
     - total_payout: total multiplier (relative to total bet)
-    - details: dict with breakdown of wins
+    - grid: the visible grid of symbol ids
+    - winning_lines: breakdown of each paying line
+    - scatter_count / free_spins: scatters on the grid and spins they award
     """
     grid = get_visible_grid(stop_positions)
 
@@ -131,65 +197,291 @@ def evaluate_spin(stop_positions):
 
     # Line payouts are per-line, convert to total bet multiplier
     # If 20 paylines, each line bet = total_bet / 20
-    num_paylines = len(PAYLINES)
-    total_payout_multiplier = total_line_payout / num_paylines
+    total_payout_multiplier = total_line_payout / NUM_PAYLINES
 
     # Evaluate scatters (pays on total bet)
     scatter_count, scatter_payout, free_spins = evaluate_scatters(grid)
     total_payout_multiplier += scatter_payout
 
-    details = {
-        "grid": grid,
+    return total_payout_multiplier, grid, winning_lines, scatter_count, free_spins
+
+
+def build_example_dict(stops, grid, winning_lines, scatter_count):
+    """Pack an evaluated spin into the example dict stored per bucket and exported."""
+    return {
+        "stops": stops,
+        "grid": grid_symbols(grid),
         "winning_lines": winning_lines,
         "scatter_count": scatter_count,
-        "scatter_payout": scatter_payout,
-        "free_spins": free_spins,
-        "total_payout": round(total_payout_multiplier, 4),
     }
 
-    return total_payout_multiplier, details
+
+def evaluate_spins_batch(stops):
+    """
+    Vectorized evaluate_spin over an (N, NUM_REELS) array of stop positions.
+    Returns (line_pay, scatter_count): per-spin line pay summed over all
+    paylines (in line-bet units, as total_line_payout above) and the number
+    of scatters on the grid.
+    """
+    rows = stops[:, :, None] + np.arange(NUM_ROWS)
+    grid = WRAPPED_STRIPS[np.arange(NUM_REELS)[None, :, None], rows]  # (N, 5, 3) symbol ids
+
+    # Every payline in one gather, reel-major so each reel is an
+    # (N, num_paylines) plane: (N, NUM_REELS, num_paylines)
+    line_syms = grid.reshape(len(stops), -1)[:, PAYLINE_IDX.T]
+
+    # Pay symbol is the first non-wild (W if all wilds): scan reels right to
+    # left. A scatter there pays nothing through its zero PAYTABLE_ARR row.
+    pay_symbol = np.full(line_syms[:, 0].shape, WILD_ID, dtype=np.int8)
+    for reel in range(NUM_REELS - 1, -1, -1):
+        syms = line_syms[:, reel]
+        pay_symbol = np.where(syms != WILD_ID, syms, pay_symbol)
+
+    # Count consecutive matches from left (wilds count)
+    in_run = np.ones(pay_symbol.shape, dtype=bool)
+    count = np.zeros(pay_symbol.shape, dtype=np.int8)
+    for reel in range(NUM_REELS):
+        syms = line_syms[:, reel]
+        in_run &= (syms == pay_symbol) | (syms == WILD_ID)
+        count += in_run
+
+    line_pay = PAYTABLE_ARR[pay_symbol, count].sum(axis=1, dtype=np.int64)
+
+    scatter_count = (grid == SCATTER_ID).sum(axis=(1, 2))
+    return line_pay, scatter_count
+
+
+# SWAR words for the numba kernel: one 8-bit lane per reel, packed into a
+# uint64. Wild is id 0, so wild lanes are exactly the zero lanes.
+LANE_BITS = 8
+LANE_LSBS = np.uint64(sum(1 << (LANE_BITS * r) for r in range(NUM_REELS)))  # 0x0101010101
+LANE_SUM_SHIFT = np.uint64(LANE_BITS * (NUM_REELS - 1))
+SCATTER_LANES = np.uint64(SCATTER_ID) * LANE_LSBS
+
+# LANE_LUT[reel, stop, row] -> that cell's symbol id already shifted into the
+# reel's lane, so a row word is the OR of one entry per reel
+_windows = WRAPPED_STRIPS[:, np.arange(STOPS_PER_REEL)[:, None] + np.arange(NUM_ROWS)]
+LANE_LUT = _windows.astype(np.uint64) << (np.arange(NUM_REELS, dtype=np.uint64)
+                                          * np.uint64(LANE_BITS))[:, None, None]
+# LINE_ROW_MASKS[line, row] -> lanes of the reels where the line crosses row
+LINE_ROW_MASKS = np.zeros((NUM_PAYLINES, NUM_ROWS), dtype=np.uint64)
+for _line, _payline in enumerate(PAYLINES):
+    for _reel, _row in enumerate(_payline):
+        LINE_ROW_MASKS[_line, _row] |= np.uint64(0xFF << (LANE_BITS * _reel))
+
+JIT_BLOCK_SIZE = 4096  # spins per prange task (each task reuses one row buffer)
+
+# None of the kernels below use cache=True: numba freezes these module
+# constants (and the generated payline code) into the compiled code but keys
+# its on-disk cache on this file alone, so an edit to slot_config.py would
+# keep running stale kernels. They are compiled once per process instead.
+
+
+@njit
+def _nonzero_lanes(word):
+    """Set the low bit of every non-zero lane (symbol ids fit in 4 bits)."""
+    word |= word >> np.uint64(1)
+    word |= word >> np.uint64(2)
+    return word & LANE_LSBS
+
+
+@njit
+def _lane_count(mask):
+    """Number of flagged lanes: multiplying sums every lane into the top one."""
+    return ((mask * LANE_LSBS) >> LANE_SUM_SHIFT) & np.uint64(0xFF)
+
+
+@njit
+def _first_set_lane(mask):
+    """Index of the lowest flagged lane (ctz / 8), NUM_REELS if none."""
+    return _lane_count(((mask & (~mask + np.uint64(1))) - np.uint64(1)) & LANE_LSBS)
+
+
+@njit
+def _word_line_pay(paytable, word):
+    """Pay of one payline already masked out of the row words (one lane per reel)."""
+    # Pay symbol is the first non-wild lane (W if all wilds)
+    non_wild = _nonzero_lanes(word)
+    first = _first_set_lane(non_wild)
+    pay = (word >> (np.uint64(LANE_BITS) * min(first, np.uint64(NUM_REELS - 1)))) & np.uint64(0xFF)
+
+    # Run ends at the first non-wild lane that differs from pay
+    breaks = _nonzero_lanes(word ^ (pay * LANE_LSBS)) & non_wild
+    return paytable[pay, _first_set_lane(breaks)]
+
+
+def _generate_fixed_paylines():
+    """
+    Source of evaluate_paylines_fixed: every payline unrolled into straight-line
+    code, so its row masks are immediates rather than LINE_ROW_MASKS loads.
+    """
+    lines = ["def evaluate_paylines_fixed(paytable, rows):"]
+    lines += [f"    row{row} = rows[{row}]" for row in range(NUM_ROWS)]
+    lines.append("    total = 0")
+    for line in range(NUM_PAYLINES):
+        terms = " | ".join(f"(row{row} & np.uint64({int(mask):#x}))"
+                           for row, mask in enumerate(LINE_ROW_MASKS[line]) if mask)
+        lines.append(f"    total += _word_line_pay(paytable, {terms})  # payline {line + 1}")
+    lines.append("    return total")
+    return "\n".join(lines) + "\n"
+
+
+_namespace = {"np": np, "_word_line_pay": _word_line_pay}
+exec(compile(_generate_fixed_paylines(), "<evaluate_paylines_fixed>", "exec"), _namespace)
+evaluate_paylines_fixed = njit(_namespace["evaluate_paylines_fixed"])
+
+
+@njit
+def _spin_line_pay(lane_lut, paytable, spin_stops, rows):
+    """
+    Evaluate one spin: returns (line_pay, scatter_count) as evaluate_spins_batch.
+    The grid is packed into one word per row (rows is scratch space); the
+    paylines are then masked out of those words by evaluate_paylines_fixed.
+    """
+    num_reels = lane_lut.shape[0]
+
+    # Row words, counting scatters as the zero lanes of word ^ S...S
+    scatters = 0
+    for row in range(NUM_ROWS):
+        word = np.uint64(0)
+        for reel in range(num_reels):
+            word |= lane_lut[reel, spin_stops[reel], row]
+        rows[row] = word
+        scatters += num_reels - _lane_count(_nonzero_lanes(word ^ SCATTER_LANES))
+
+    return evaluate_paylines_fixed(paytable, rows), scatters
+
+
+@njit(parallel=True)
+def simulate_batch(lane_lut, paytable, stops, line_pay, scatter_count):
+    """nopython kernel behind evaluate_spins_jit; fills the preallocated outputs."""
+    num_spins = stops.shape[0]
+
+    for block in prange((num_spins + JIT_BLOCK_SIZE - 1) // JIT_BLOCK_SIZE):
+        rows = np.empty(NUM_ROWS, dtype=np.uint64)
+        for i in range(block * JIT_BLOCK_SIZE, min(num_spins, (block + 1) * JIT_BLOCK_SIZE)):
+            line_pay[i], scatter_count[i] = _spin_line_pay(
+                lane_lut, paytable, stops[i], rows)
+
+
+@njit(nogil=True)
+def _payout_histogram(lane_lut, paytable, scatter_pays, stops_per_reel, num_paylines,
+                      seed, num_spins, counts):
+    """
+    Simulate num_spins with numba's own generator seeded from seed, adding
+    each payout (in cents) into counts. Releases the GIL, so shards run
+    concurrently from plain threads; the generator state is per thread.
+    The reel length and line count are arguments rather than frozen globals.
+    """
+    np.random.seed(seed)
+    spin_stops = np.empty(lane_lut.shape[0], dtype=np.int64)
+    rows = np.empty(NUM_ROWS, dtype=np.uint64)
+    for _ in range(num_spins):
+        for reel in range(spin_stops.shape[0]):
+            spin_stops[reel] = np.random.randint(0, stops_per_reel)
+        line_pay, scatters = _spin_line_pay(lane_lut, paytable, spin_stops, rows)
+        # Integer cents, as payout_cents
+        counts[line_pay * 100 // num_paylines + scatter_pays[scatters] * 100] += 1
+    return counts
+
+
+def evaluate_spins_jit(stops):
+    """
+    Numba-compiled equivalent of evaluate_spins_batch (same return values).
+    Runs spins in parallel across cores; requires numba.
+    """
+    stops = np.ascontiguousarray(stops)
+    line_pay = np.empty(len(stops), dtype=np.int64)
+    scatter_count = np.empty(len(stops), dtype=np.int64)
+    simulate_batch(LANE_LUT, PAYTABLE_ARR, stops, line_pay, scatter_count)
+    return line_pay, scatter_count
 
 
 # ─── SIMULATION ─────────────────────────────────────────────────────
 
+def usable_cpu_count():
+    """Cores this process may run on (respects CPU affinity where the OS exposes it)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def payout_cents(line_pay, scatter_count):
+    """
+    Spin payouts as int32 cents of total bet, from the (line_pay,
+    scatter_count) of evaluate_spins_batch / evaluate_spins_jit. Line pays
+    are per line bet and scatters pay on total bet; the division by
+    NUM_PAYLINES is exact because it divides 100 (checked at import; 20
+    paylines: 5 cents per unit of line pay), so nothing is rounded.
+    """
+    return (line_pay * 100 // NUM_PAYLINES + SCATTER_PAYS_ARR[scatter_count] * 100).astype(np.int32)
+
+
+def bucket_payouts(cents, num_examples):
+    """
+    Bucket integer payout cents. Returns (keys, counts, examples): the
+    bucket payouts in cents in ascending order, their counts, and for each
+    bucket the indices of its first num_examples samples (in draw order),
+    picked in a single pass once all payouts are known rather than while
+    simulating.
+    """
+    by_bucket = np.argsort(cents, kind="stable")
+    sorted_cents = cents[by_bucket]
+    unique_cents, counts = np.unique(sorted_cents, return_counts=True)
+    starts = np.searchsorted(sorted_cents, unique_cents)
+    counts = counts.tolist()
+    examples = [by_bucket[first:first + min(count, num_examples)].tolist()
+                for first, count in zip(starts.tolist(), counts)]
+    return unique_cents.tolist(), counts, examples
+
+
+def bucket_base_outcomes(cents, stops_at):
+    """
+    Bucket base-game payout cents into the outcome_buckets dict the
+    exporters take, keyed by payout in cents. Stores a few example grids
+    per bucket (for frontend testing): the first 3 spins of each bucket,
+    whose stops come from stops_at(index) and are re-evaluated with the
+    scalar evaluate_spin.
+    """
+    keys, counts, example_idx = bucket_payouts(cents, 3)
+    outcome_buckets = {}
+    for key, count, indices in zip(keys, counts, example_idx):
+        examples = []
+        for i in indices:
+            example_stops = stops_at(i)
+            _, grid, winning_lines, scatter_count, _ = evaluate_spin(example_stops)
+            examples.append(build_example_dict(example_stops, grid, winning_lines, scatter_count))
+        outcome_buckets[key] = {"count": count, "examples": examples}
+    return outcome_buckets
+
+
 def run_simulation(num_samples=2_000_000):
     """
     Run Monte Carlo simulation to generate outcome distribution.
-    Returns a dict mapping payout_multiplier -> (count, example_details).
+    Returns a dict mapping payout cents -> (count, example_details).
+    All stops are drawn up front and evaluated in batches, by the numba
+    kernel when available and the NumPy evaluator otherwise.
     """
     print(f"Running simulation with {num_samples:,} spins...")
     start = time.time()
 
-    # Track outcomes bucketed by payout (rounded to 2 decimal places)
-    outcome_buckets = defaultdict(lambda: {"count": 0, "examples": []})
-    total_payout = 0
-
-    for i in range(num_samples):
-        # Random stop positions for each reel
-        stops = [random.randint(0, STOPS_PER_REEL - 1) for _ in range(NUM_REELS)]
-        payout, details = evaluate_spin(stops)
-
-        # Round payout for bucketing
-        payout_key = round(payout, 2)
-        outcome_buckets[payout_key]["count"] += 1
-
-        # Store a few example grids per bucket (for frontend testing)
-        if len(outcome_buckets[payout_key]["examples"]) < 3:
-            outcome_buckets[payout_key]["examples"].append({
-                "stops": stops,
-                "grid": details["grid"],
-                "winning_lines": details["winning_lines"],
-                "scatter_count": details["scatter_count"],
-            })
+    stops = rng.integers(0, STOPS_PER_REEL, size=(num_samples, NUM_REELS), dtype=np.int8)
+    cents = np.empty(num_samples, dtype=np.int32)
+    evaluate = evaluate_spins_jit if HAVE_NUMBA else evaluate_spins_batch
 
-        total_payout += payout
+    for lo in range(0, num_samples, SIM_CHUNK_SIZE):
+        hi = min(lo + SIM_CHUNK_SIZE, num_samples)
+        cents[lo:hi] = payout_cents(*evaluate(stops[lo:hi]))
 
-        if (i + 1) % 500_000 == 0:
+        if hi % 500_000 == 0:
             elapsed = time.time() - start
-            print(f"  {i+1:>10,} spins | RTP so far: {total_payout/(i+1)*100:.2f}% | {elapsed:.1f}s")
+            # Mean payout in cents per unit bet is the RTP in percent
+            print(f"  {hi:>10,} spins | RTP so far: {cents[:hi].mean():.2f}% | {elapsed:.1f}s")
+
+    outcome_buckets = bucket_base_outcomes(cents, lambda i: stops[i].tolist())
 
     elapsed = time.time() - start
-    actual_rtp = total_payout / num_samples
+    actual_rtp = int(cents.sum(dtype=np.int64)) / 100 / num_samples
 
     print(f"\n{'='*60}")
     print(f"Simulation Complete")
@@ -199,12 +491,176 @@ def run_simulation(num_samples=2_000_000):
     print(f"  Actual RTP:     {actual_rtp*100:.4f}%")
     print(f"  Target RTP:     {TARGET_RTP*100:.2f}%")
     print(f"  Unique payouts: {len(outcome_buckets)}")
-    print(f"  Hit rate:       {(1 - outcome_buckets[0.0]['count']/num_samples)*100:.2f}%")
+    print(f"  Hit rate:       {(1 - outcome_buckets.get(0, {'count': 0})['count']/num_samples)*100:.2f}%")
     print(f"{'='*60}\n")
 
     return outcome_buckets, actual_rtp
 
 
+def outcome_stops(index):
+    """
+    Stop positions of outcome number index (or an array of them) in
+    enumeration order: reel 1 varies slowest, as in itertools.product.
+    """
+    return ((np.asarray(index)[..., None] // OUTCOME_STRIDES) % STOPS_PER_REEL).astype(np.int8)
+
+
+def enumerate_all_outcomes():
+    """
+    Evaluate every one of the NUM_OUTCOMES stop combinations instead of
+    sampling. Each is equally likely, so bucket counts / NUM_OUTCOMES are the
+    exact payout probabilities and the returned RTP is exact. Returns the
+    same (outcome_buckets, rtp) as run_simulation; pass NUM_OUTCOMES as the
+    total to the exporters.
+    """
+    print(f"Enumerating all {NUM_OUTCOMES:,} outcomes...")
+    start = time.time()
+
+    cents = np.empty(NUM_OUTCOMES, dtype=np.int32)
+    evaluate = evaluate_spins_jit if HAVE_NUMBA else evaluate_spins_batch
+    total_line_pay = 0
+    total_scatter_pay = 0
+
+    for lo in range(0, NUM_OUTCOMES, EXHAUSTIVE_BATCH_SIZE):
+        hi = min(lo + EXHAUSTIVE_BATCH_SIZE, NUM_OUTCOMES)
+        line_pay, scatter_count = evaluate(outcome_stops(np.arange(lo, hi)))
+        cents[lo:hi] = payout_cents(line_pay, scatter_count)
+        # Integer totals keep the RTP exact up to the final division
+        total_line_pay += int(line_pay.sum())
+        total_scatter_pay += int(SCATTER_PAYS_ARR[scatter_count].sum())
+
+    outcome_buckets = bucket_base_outcomes(cents, lambda i: outcome_stops(i).tolist())
+
+    elapsed = time.time() - start
+    exact_rtp = (total_line_pay / NUM_PAYLINES + total_scatter_pay) / NUM_OUTCOMES
+
+    print(f"\n{'='*60}")
+    print(f"Enumeration Complete")
+    print(f"{'='*60}")
+    print(f"  Outcomes:       {NUM_OUTCOMES:,}")
+    print(f"  Time:           {elapsed:.1f}s")
+    print(f"  Exact RTP:      {exact_rtp*100:.4f}%")
+    print(f"  Target RTP:     {TARGET_RTP*100:.2f}%")
+    print(f"  Unique payouts: {len(outcome_buckets)}")
+    print(f"  Hit rate:       {(1 - outcome_buckets.get(0, {'count': 0})['count']/NUM_OUTCOMES)*100:.2f}%")
+    print(f"{'='*60}\n")
+
+    return outcome_buckets, exact_rtp
+
+
+def simulate_payout_histogram(num_samples, workers=None, seed=42, use_gpu=False):
+    """
+    Counts-only Monte Carlo: the payout distribution of num_samples spins
+    without keeping stops or examples, for runs too large to hold in memory.
+    main() does not call it, since the base game is enumerated exactly;
+    it is meant to be called directly for large sampled cross-checks of
+    the payout distribution (e.g. against enumerate_all_outcomes).
+
+    On the CPU (the default), the samples are split into HISTOGRAM_SHARDS
+    shards, each seeded from its own SeedSequence child and run by the nogil
+    kernel on a pool of workers threads (default: usable_cpu_count()), and
+    the shards' cent histograms are summed, so the CPU result depends only
+    on num_samples and seed. use_gpu opts in to simulate_payout_histogram_cuda
+    instead (it needs HAVE_CUDA, ignores workers since its thread grid is
+    fixed, and draws from a different generator, so its results differ; it
+    has only been run under the CUDA simulator). Returns (payouts, counts)
+    for the payouts that occurred, in ascending order.
+    """
+    if use_gpu:
+        if not HAVE_CUDA:
+            raise RuntimeError("use_gpu needs numba.cuda and a CUDA device")
+        return simulate_payout_histogram_cuda(num_samples, seed)
+
+    counts = np.zeros(MAX_PAYOUT_CENTS + 1, dtype=np.int64)
+    shard_sizes = [num_samples // HISTOGRAM_SHARDS + (s < num_samples % HISTOGRAM_SHARDS)
+                   for s in range(HISTOGRAM_SHARDS)]
+    shard_seeds = np.random.SeedSequence(seed).spawn(HISTOGRAM_SHARDS)
+
+    if HAVE_NUMBA:
+        def run_shard(shard):
+            shard_seed, shard_size = shard
+            return _payout_histogram(LANE_LUT, PAYTABLE_ARR, SCATTER_PAYS_ARR,
+                                     STOPS_PER_REEL, NUM_PAYLINES,
+                                     int(shard_seed.generate_state(1)[0]), shard_size,
+                                     np.zeros_like(counts))
+
+        with ThreadPoolExecutor(workers or usable_cpu_count()) as pool:
+            for shard_counts in pool.map(run_shard, zip(shard_seeds, shard_sizes)):
+                counts += shard_counts
+    else:
+        # Without numba the kernel would hold the GIL, so draw and evaluate
+        # NumPy batches of each shard on this thread instead
+        for shard_seed, shard_size in zip(shard_seeds, shard_sizes):
+            shard_rng = np.random.default_rng(shard_seed)
+            for lo in range(0, shard_size, SIM_CHUNK_SIZE):
+                size = min(SIM_CHUNK_SIZE, shard_size - lo)
+                stops = shard_rng.integers(0, STOPS_PER_REEL, size=(size, NUM_REELS), dtype=np.int8)
+                counts += np.bincount(payout_cents(*evaluate_spins_batch(stops)),
+                                      minlength=len(counts))
+
+    occurred = np.flatnonzero(counts)
+    return occurred / 100, counts[occurred]
+
+
+CUDA_THREADS_PER_BLOCK = 256
+CUDA_BLOCKS = 1024           # fixed grid; each thread strides over its samples
+CUDA_BATCH_SIZE = 1 << 24    # samples per launch (bounds the device cents buffer)
+
+# Largest multiple of STOPS_PER_REEL below 2**64: raw draws at or above it
+# are rejected, so every stop is exactly equally likely
+CUDA_STOP_LIMIT = np.uint64((2 ** 64 // STOPS_PER_REEL) * STOPS_PER_REEL)
+
+if HAVE_CUDA:
+    @cuda.jit(device=True)
+    def _cuda_draw_stop(rng_states, thread):
+        """Uniform stop from the thread's raw uint64 stream, by rejection (no float bias)."""
+        draw = xoroshiro128p_next(rng_states, thread)
+        while draw >= CUDA_STOP_LIMIT:
+            draw = xoroshiro128p_next(rng_states, thread)
+        return int32(draw % uint64(STOPS_PER_REEL))
+
+    @cuda.jit
+    def _cuda_payout_kernel(rng_states, cents):
+        """One spin per sample, drawn from the thread's xoroshiro128+ stream."""
+        # The lookup tables are tiny and read by every thread: constant memory
+        lane_lut = cuda.const.array_like(LANE_LUT)
+        paytable = cuda.const.array_like(PAYTABLE_ARR)
+        scatter_pays = cuda.const.array_like(SCATTER_PAYS_ARR)
+
+        thread = cuda.grid(1)
+        spin_stops = cuda.local.array(NUM_REELS, dtype=int32)
+        rows = cuda.local.array(NUM_ROWS, dtype=uint64)
+        for i in range(thread, cents.shape[0], cuda.gridsize(1)):
+            for reel in range(NUM_REELS):
+                spin_stops[reel] = _cuda_draw_stop(rng_states, thread)
+            # numba compiles the CPU kernels' njit helpers as device functions,
+            # so the spin is evaluated by the same code as on the CPU
+            line_pay, scatters = _spin_line_pay(lane_lut, paytable, spin_stops, rows)
+            # Payout in cents, as payout_cents
+            cents[i] = line_pay * 100 // NUM_PAYLINES + scatter_pays[scatters] * 100
+
+
+def simulate_payout_histogram_cuda(num_samples, seed=42):
+    """
+    GPU version of simulate_payout_histogram (same return values): a fixed
+    grid of threads, each with its own xoroshiro128+ state, fills a device
+    buffer of payout cents per launch, and the host bincounts each batch.
+    Requires numba.cuda and a CUDA device.
+    """
+    num_threads = CUDA_BLOCKS * CUDA_THREADS_PER_BLOCK
+    rng_states = create_xoroshiro128p_states(num_threads, seed=seed)
+    cents = cuda.device_array(min(num_samples, CUDA_BATCH_SIZE), dtype=np.int32)
+    counts = np.zeros(MAX_PAYOUT_CENTS + 1, dtype=np.int64)
+
+    for lo in range(0, num_samples, CUDA_BATCH_SIZE):
+        batch = cents[:min(CUDA_BATCH_SIZE, num_samples - lo)]
+        _cuda_payout_kernel[CUDA_BLOCKS, CUDA_THREADS_PER_BLOCK](rng_states, batch)
+        counts += np.bincount(batch.copy_to_host(), minlength=len(counts))
+
+    occurred = np.flatnonzero(counts)
+    return occurred / 100, counts[occurred]
+
+
 # ─── FREE SPINS SIMULATION ─────────────────────────────────────────
 
 def simulate_free_spins_mode(num_sessions=500_000):
@@ -215,39 +671,38 @@ def simulate_free_spins_mode(num_sessions=500_000):
     print(f"Simulating free spins mode ({num_sessions:,} sessions)...")
     start = time.time()
 
-    fs_outcomes = defaultdict(lambda: {"count": 0, "examples": []})
-
-    for session in range(num_sessions):
-        # Determine number of free spins (weighted by trigger frequency)
-        # For simplicity, use 10 spins as the most common trigger
-        num_fs = random.choices(
-            [10, 15, 25],
-            weights=[0.85, 0.12, 0.03],
-            k=1
-        )[0]
-
-        session_payout = 0
-        session_grids = []
-
-        for spin in range(num_fs):
-            stops = [random.randint(0, STOPS_PER_REEL - 1) for _ in range(NUM_REELS)]
-            payout, details = evaluate_spin(stops)
-            # Apply free spins multiplier (but not to scatter wins within FS)
-            line_payout = sum(w["payout"] for w in details["winning_lines"]) / len(PAYLINES)
-            boosted = line_payout * FREE_SPINS_MULTIPLIER
-            session_payout += boosted
-            session_grids.append(details["grid"])
-
-        payout_key = round(session_payout, 2)
-        fs_outcomes[payout_key]["count"] += 1
-        if len(fs_outcomes[payout_key]["examples"]) < 2:
-            fs_outcomes[payout_key]["examples"].append({
-                "num_spins": num_fs,
-                "grids": session_grids[:3],  # Store first 3 grids as preview
+    # Determine number of free spins per session (weighted by trigger
+    # frequency), then draw every session's stops in one flat batch
+    session_spins = rng.choice([10, 15, 25], size=num_sessions, p=[0.85, 0.12, 0.03])
+    session_starts = np.cumsum(session_spins) - session_spins
+    all_stops = rng.integers(0, STOPS_PER_REEL, size=(session_spins.sum(), NUM_REELS), dtype=np.int8)
+
+    evaluate = evaluate_spins_jit if HAVE_NUMBA else evaluate_spins_batch
+    line_pay = np.empty(len(all_stops), dtype=np.int64)
+    for lo in range(0, len(all_stops), SIM_CHUNK_SIZE):
+        line_pay[lo:lo + SIM_CHUNK_SIZE] = evaluate(all_stops[lo:lo + SIM_CHUNK_SIZE])[0]
+
+    # Sum line pays per session, then apply free spins multiplier (but not
+    # to scatter wins within FS), in integer cents as payout_cents
+    session_line_pay = np.add.reduceat(line_pay, session_starts)
+    session_cents = session_line_pay * (100 * FREE_SPINS_MULTIPLIER) // NUM_PAYLINES
+
+    keys, counts, example_idx = bucket_payouts(session_cents, 2)
+    fs_outcomes = {}
+    for key, count, sessions in zip(keys, counts, example_idx):
+        examples = []
+        for session in sessions:
+            spins_start = session_starts[session]
+            examples.append({
+                "num_spins": int(session_spins[session]),
+                # Store first 3 grids as preview
+                "grids": [grid_symbols(get_visible_grid(stops))
+                          for stops in all_stops[spins_start:spins_start + 3].tolist()],
             })
+        fs_outcomes[key] = {"count": count, "examples": examples}
 
     elapsed = time.time() - start
-    avg_payout = sum(p * d["count"] for p, d in fs_outcomes.items()) / num_sessions
+    avg_payout = sum(c * d["count"] for c, d in fs_outcomes.items()) / 100 / num_sessions
 
     print(f"  Free spins avg payout: {avg_payout:.2f}x")
     print(f"  Time: {elapsed:.1f}s\n")
@@ -257,6 +712,32 @@ def simulate_free_spins_mode(num_sessions=500_000):
 
 # ─── EXPORT TO STAKE ENGINE FORMAT ─────────────────────────────────
 
+CSV_HEADER = "simulation_number,probability,payout_multiplier\r\n"
+GZIP_LEVEL = 6  # faster than the default 9; CSVs are ~same size, events JSON ~15% larger
+
+
+def write_with_gzip(filepath, text):
+    """
+    Write text to filepath and, in the same pass, to filepath + ".gz", so
+    the compressed copy never re-reads the uncompressed file.
+    """
+    with open(filepath, "w", newline="") as f, \
+            gzip.open(filepath + ".gz", "wt", newline="", compresslevel=GZIP_LEVEL) as gz:
+        f.write(text)
+        gz.write(text)
+
+
+def sorted_buckets(buckets):
+    """
+    (cents, data) pairs of an outcome dict in ascending payout order, via
+    one np.argsort over its keys instead of a Python sort with a key lambda.
+    """
+    keys = list(buckets)
+    values = list(buckets.values())
+    order = np.argsort(np.array(keys, dtype=np.int64), kind="stable")
+    return [(keys[i], values[i]) for i in order.tolist()]
+
+
 def export_base_game_csv(outcome_buckets, total_samples):
     """
     Export base game outcomes to CSV in Stake Engine format.
@@ -265,29 +746,17 @@ def export_base_game_csv(outcome_buckets, total_samples):
     filepath = os.path.join(OUTPUT_DIR, "base_game.csv")
 
     # Sort by payout
-    sorted_outcomes = sorted(outcome_buckets.items(), key=lambda x: x[0])
-
-    sim_number = 0
-    rows = []
-
-    for payout, data in sorted_outcomes:
-        probability = data["count"] / total_samples
-        rows.append({
-            "simulation_number": sim_number,
-            "probability": round(probability, 10),
-            "payout_multiplier": payout,
-        })
-        sim_number += 1
-
-    with open(filepath, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["simulation_number", "probability", "payout_multiplier"])
-        writer.writeheader()
-        writer.writerows(rows)
-
+    sorted_outcomes = sorted_buckets(outcome_buckets)
+
+    # One formatted line per bucket, written in a single call. CRLF and
+    # str() formatting match what csv.DictWriter produced; bucket keys are
+    # cents, so the multiplier only becomes a float here.
+    rows = [
+        f"{sim_number},{round(data['count'] / total_samples, 10)},{cents / 100}\r\n"
+        for sim_number, (cents, data) in enumerate(sorted_outcomes)
+    ]
     # Also create compressed version
-    with open(filepath, "rb") as f_in:
-        with gzip.open(filepath + ".gz", "wb") as f_out:
-            f_out.write(f_in.read())
+    write_with_gzip(filepath, CSV_HEADER + "".join(rows))
 
     print(f"Exported {len(rows)} base game outcomes to {filepath}")
     return filepath
@@ -299,28 +768,15 @@ def export_free_spins_csv(fs_outcomes, total_sessions):
     """
     filepath = os.path.join(OUTPUT_DIR, "free_spins.csv")
 
-    sorted_outcomes = sorted(fs_outcomes.items(), key=lambda x: x[0])
-
-    sim_number = 0
-    rows = []
-
-    for payout, data in sorted_outcomes:
-        probability = data["count"] / total_sessions
-        rows.append({
-            "simulation_number": sim_number,
-            "probability": round(probability, 10),
-            "payout_multiplier": payout,
-        })
-        sim_number += 1
+    sorted_outcomes = sorted_buckets(fs_outcomes)
 
-    with open(filepath, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["simulation_number", "probability", "payout_multiplier"])
-        writer.writeheader()
-        writer.writerows(rows)
-
-    with open(filepath, "rb") as f_in:
-        with gzip.open(filepath + ".gz", "wb") as f_out:
-            f_out.write(f_in.read())
+    # One formatted line per bucket, written in a single call, as in
+    # export_base_game_csv
+    rows = [
+        f"{sim_number},{round(data['count'] / total_sessions, 10)},{cents / 100}\r\n"
+        for sim_number, (cents, data) in enumerate(sorted_outcomes)
+    ]
+    write_with_gzip(filepath, CSV_HEADER + "".join(rows))
 
     print(f"Exported {len(rows)} free spins outcomes to {filepath}")
     return filepath
@@ -336,25 +792,20 @@ def export_game_events(outcome_buckets, mode="base"):
     events = {}
     sim_number = 0
 
-    for payout, data in sorted(outcome_buckets.items(), key=lambda x: x[0]):
+    for cents, data in sorted_buckets(outcome_buckets):
         # Use the first example for this payout bucket
         if data["examples"]:
             example = data["examples"][0]
             events[str(sim_number)] = {
-                "payout_multiplier": payout,
+                "payout_multiplier": cents / 100,
                 "grid": example.get("grid", []),
                 "winning_lines": example.get("winning_lines", []),
                 "scatter_count": example.get("scatter_count", 0),
             }
         sim_number += 1
 
-    with open(filepath, "w") as f:
-        json.dump(events, f, indent=2)
-
-    # Compressed version
-    with open(filepath, "rb") as f_in:
-        with gzip.open(filepath + ".gz", "wb") as f_out:
-            f_out.write(f_in.read())
+    # Plain and compressed versions
+    write_with_gzip(filepath, json_dumps(events))
 
     print(f"Exported {len(events)} game events to {filepath}")
     return filepath
@@ -370,7 +821,7 @@ def export_game_config():
         "game_name": "Jewel Rush",
         "num_reels": NUM_REELS,
         "num_rows": NUM_ROWS,
-        "num_paylines": len(PAYLINES),
+        "num_paylines": NUM_PAYLINES,
         "symbols": {k: {"name": v["name"], "tier": v["tier"]} for k, v in SYMBOLS.items()},
         "paylines": PAYLINES,
         "paytable": PAYTABLE,
@@ -381,7 +832,7 @@ def export_game_config():
     }
 
     with open(filepath, "w") as f:
-        json.dump(config, f, indent=2)
+        f.write(json_dumps(config))
 
     print(f"Exported game config to {filepath}")
     return filepath
@@ -395,9 +846,8 @@ if __name__ == "__main__":
     print("║        Stake Engine Outcome Builder              ║")
     print("╚══════════════════════════════════════════════════╝\n")
 
-    # Phase 1: Simulate base game
-    NUM_BASE_SAMPLES = 2_000_000
-    base_outcomes, base_rtp = run_simulation(NUM_BASE_SAMPLES)
+    # Phase 1: Enumerate the base game (every outcome, exact probabilities)
+    base_outcomes, base_rtp = enumerate_all_outcomes()
 
     # Phase 2: Simulate free spins
     NUM_FS_SESSIONS = 500_000
@@ -405,7 +855,7 @@ if __name__ == "__main__":
 
     # Phase 3: Export everything
     print("Exporting files for Stake Engine...\n")
-    export_base_game_csv(base_outcomes, NUM_BASE_SAMPLES)
+    export_base_game_csv(base_outcomes, NUM_OUTCOMES)
     export_free_spins_csv(fs_outcomes, NUM_FS_SESSIONS)
     export_game_events(base_outcomes, "base")
     export_game_config()
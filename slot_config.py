@@ -5,6 +5,8 @@ Defines the game's symbols, reels, paylines, and payout table.
 This is a 5-reel, 3-row slot game (standard video slot format).
 """
 
+import numpy as np
+
 # ─── SYMBOL DEFINITIONS ─────────────────────────────────────────────
 # Each symbol has an ID, name, and tier (affects visual treatment)
 SYMBOLS = {
@@ -50,6 +52,7 @@ REEL_STRIPS = [
 NUM_REELS = 5
 NUM_ROWS = 3
 STOPS_PER_REEL = len(REEL_STRIPS[0])  # 30
+NUM_OUTCOMES = STOPS_PER_REEL ** NUM_REELS  # 24,300,000 equally likely stop combinations
 
 # ─── PAYLINES ───────────────────────────────────────────────────────
 # 20 paylines. Each payline maps reel index -> row index (0-based).
@@ -76,6 +79,7 @@ PAYLINES = [
     [2, 2, 1, 2, 2],  # 19: Bottom with rise
     [0, 2, 0, 2, 0],  # 20: Big zigzag
 ]
+NUM_PAYLINES = len(PAYLINES)
 
 # ─── PAYTABLE ───────────────────────────────────────────────────────
 # Payouts per symbol for 3, 4, or 5 of a kind on a payline.
@@ -111,3 +115,38 @@ FREE_SPINS_MULTIPLIER = 3
 
 # ─── TARGET RTP ─────────────────────────────────────────────────────
 TARGET_RTP = 0.96  # 96% return to player
+
+# ─── INTEGER ENCODING ───────────────────────────────────────────────
+# Array forms of the tables above for the vectorized evaluators. Symbols
+# become small ints (W=0, S=1, H1=2 ... L4=8) so reels and paylines are
+# dense int8 arrays and every pay lookup is a plain array index.
+SYMBOL_ID = {sym: i for i, sym in enumerate(SYMBOLS)}
+SYMBOL_NAMES = list(SYMBOLS)  # id -> symbol key
+NUM_SYMBOLS = len(SYMBOLS)
+WILD_ID = SYMBOL_ID["W"]
+SCATTER_ID = SYMBOL_ID["S"]
+
+# REEL_STRIPS_NP[reel, stop] -> symbol id
+REEL_STRIPS_NP = np.array(
+    [[SYMBOL_ID[sym] for sym in strip] for strip in REEL_STRIPS], dtype=np.int8
+)
+# PAYLINES_NP[line, reel] -> row
+PAYLINES_NP = np.array(PAYLINES, dtype=np.int8)
+# PAYLINE_IDX[line, reel] -> cell of a reel-major flattened (NUM_REELS *
+# NUM_ROWS) grid, so grid_flat[:, PAYLINE_IDX] gathers every line at once
+PAYLINE_IDX = np.arange(NUM_REELS) * NUM_ROWS + PAYLINES_NP
+
+# PAYTABLE_ARR[sym_id, count] -> line pay; zero for count < 3 and scatters
+PAYTABLE_ARR = np.zeros((NUM_SYMBOLS, NUM_REELS + 1), dtype=np.int32)
+for _sym, _pays in PAYTABLE.items():
+    for _count, _pay in _pays.items():
+        PAYTABLE_ARR[SYMBOL_ID[_sym], _count] = _pay
+
+# Indexed by scatter count. Sized for a full grid of scatters so any
+# strip layout indexes safely, not just one scatter per reel.
+SCATTER_PAYS_ARR = np.zeros(NUM_REELS * NUM_ROWS + 1, dtype=np.int32)
+FREE_SPINS_ARR = np.zeros(NUM_REELS * NUM_ROWS + 1, dtype=np.int32)
+for _count, _pay in SCATTER_PAYS.items():
+    SCATTER_PAYS_ARR[_count] = _pay
+for _count, _spins in FREE_SPINS_TRIGGER.items():
+    FREE_SPINS_ARR[_count] = _spins
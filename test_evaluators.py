@@ -0,0 +1,114 @@
+"""
+Evaluator Equivalence Checks
+============================
+Each game evaluates spins several ways: the scalar evaluate_spin, the NumPy
+evaluate_spins_batch and the numba evaluate_spins_jit (SWAR lane tricks).
+These checks run all of them over random stops plus every combination of
+stops that puts a wild or a scatter on some row of each reel, which covers
+all-wild lines and lines led by a scatter, and require identical results.
+
+Run with: python -m unittest test_evaluators
+"""
+
+import importlib.util
+import itertools
+import unittest
+
+import numpy as np
+
+import simulator
+from slot_config import NUM_REELS, NUM_ROWS, STOPS_PER_REEL, REEL_STRIPS_NP, WILD_ID, SCATTER_ID
+
+RANDOM_SPINS = 20_000
+
+# The Golden Reef engine's file name has hyphens, so it can't be imported by name
+_spec = importlib.util.spec_from_file_location("golden_reef", "golden-reef-math-engine.py")
+golden_reef = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(golden_reef)
+
+
+def edge_case_stops(strips, lengths, symbol_ids):
+    """
+    Every combination of stops that shows one of symbol_ids on some row of
+    every reel: per reel, the stops placing each such symbol on each row.
+    """
+    per_reel = []
+    for strip, length in zip(strips, lengths):
+        positions = np.flatnonzero(np.isin(strip[:length], symbol_ids))
+        per_reel.append(sorted({int(pos - row) % length for pos in positions for row in range(NUM_ROWS)}))
+    return np.array(list(itertools.product(*per_reel)))
+
+
+class JewelRushEvaluatorsTest(unittest.TestCase):
+    """simulator.py: evaluate_spin vs evaluate_spins_batch vs evaluate_spins_jit."""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(7)
+        random_stops = rng.integers(0, STOPS_PER_REEL, size=(RANDOM_SPINS, NUM_REELS))
+        edge_stops = edge_case_stops(REEL_STRIPS_NP, [STOPS_PER_REEL] * NUM_REELS, [WILD_ID, SCATTER_ID])
+        cls.stops = np.concatenate([random_stops, edge_stops]).astype(np.int8)
+        cls.line_pay, cls.scatter_count = simulator.evaluate_spins_batch(cls.stops)
+
+    def test_edge_cases_are_covered(self):
+        grids = [simulator.get_visible_grid(stops) for stops in self.stops.tolist()]
+        lines = [[grid[reel][row] for reel, row in enumerate(payline)]
+                 for grid in grids for payline in simulator.PAYLINES]
+        self.assertIn([WILD_ID] * NUM_REELS, lines)
+        self.assertIn([SCATTER_ID] + [WILD_ID] * (NUM_REELS - 1), lines)
+
+    def test_batch_matches_scalar(self):
+        cents = simulator.payout_cents(self.line_pay, self.scatter_count)
+        for spin, stops in enumerate(self.stops.tolist()):
+            total_payout, _, _, scatter_count, _ = simulator.evaluate_spin(stops)
+            self.assertEqual(round(total_payout * 100), cents[spin], stops)
+            self.assertEqual(scatter_count, self.scatter_count[spin], stops)
+
+    @unittest.skipUnless(simulator.HAVE_NUMBA, "numba not installed")
+    def test_jit_matches_batch(self):
+        line_pay, scatter_count = simulator.evaluate_spins_jit(self.stops)
+        np.testing.assert_array_equal(line_pay, self.line_pay)
+        np.testing.assert_array_equal(scatter_count, self.scatter_count)
+
+
+class GoldenReefEvaluatorsTest(unittest.TestCase):
+    """golden-reef-math-engine.py: evaluate_spin vs evaluate_spins_batch vs evaluate_spins_jit."""
+
+    @classmethod
+    def setUpClass(cls):
+        gr = golden_reef
+        rng = np.random.default_rng(7)
+        random_stops = rng.integers(0, gr.REEL_LENGTHS, size=(RANDOM_SPINS, gr.NUM_REELS))
+        edge_stops = edge_case_stops(gr.STRIPS, gr.REEL_LENGTHS, [gr.WILD_ID, gr.SCATTER_ID])
+        cls.stops = np.concatenate([random_stops, edge_stops])
+        cls.batch = gr.evaluate_spins_batch(cls.stops)
+
+    def test_edge_cases_are_covered(self):
+        gr = golden_reef
+        # Row-major grid, so cell (reel, row) is at row * NUM_REELS + reel
+        line_cells = gr.PAYLINES_ARR * gr.NUM_REELS + np.arange(gr.NUM_REELS)
+        lines = {tuple(line) for line in self.batch["grid"][:, line_cells].reshape(-1, gr.NUM_REELS).tolist()}
+        self.assertIn((gr.WILD_ID,) * gr.NUM_REELS, lines)
+        self.assertIn((gr.SCATTER_ID,) + (gr.WILD_ID,) * (gr.NUM_REELS - 1), lines)
+
+    def test_batch_matches_scalar(self):
+        for spin, stops in enumerate(self.stops.tolist()):
+            total_payout, grid_ids, line_payouts, scatter_count, scatter_payout, free_spins = \
+                golden_reef.evaluate_spin(stops)
+            self.assertEqual(total_payout, self.batch["total_payout"][spin], stops)
+            np.testing.assert_array_equal(grid_ids, self.batch["grid"][spin])
+            np.testing.assert_array_equal(line_payouts, self.batch["line_payouts"][spin])
+            self.assertEqual(scatter_count, self.batch["scatter_count"][spin], stops)
+            self.assertEqual(scatter_payout, self.batch["scatter_payout"][spin], stops)
+            self.assertEqual(free_spins, self.batch["free_spins_awarded"][spin], stops)
+
+    @unittest.skipUnless(golden_reef.HAVE_NUMBA, "numba not installed")
+    def test_jit_matches_batch(self):
+        jit = golden_reef.evaluate_spins_jit(self.stops)
+        self.assertEqual(jit.keys(), self.batch.keys())
+        for key, values in self.batch.items():
+            np.testing.assert_array_equal(jit[key], values, err_msg=key)
+
+
+if __name__ == "__main__":
+    unittest.main()